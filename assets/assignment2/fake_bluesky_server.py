@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Bluesky public XRPC API, for offline testing.
+
+Serves the endpoints used by bluesky_helpers.py:
+
+    app.bsky.actor.getProfile      app.bsky.graph.getFollows
+    app.bsky.actor.getProfiles     app.bsky.feed.getAuthorFeed
+    app.bsky.feed.getPostThread
+
+Data is synthetic but deterministic: every handle (including real senator
+handles) gets its own follows, posts and reply threads, generated from a
+hash of the handle, so the same request always returns the same answer.
+Alternatively, serve recorded data with --fixtures (see load_fixtures()).
+
+The server can also imitate a slow or overloaded API: added latency, random
+429 responses, and a real request quota with ratelimit-* headers, so
+crawler concurrency and backoff can be load-tested without the network.
+
+Usage:
+    python fake_bluesky_server.py --port 8800 --latency 0.05 --rate-limit 3000
+
+    # in another terminal / notebook
+    BLUESKY_API_BASE=http://127.0.0.1:8800/xrpc python bluesky_helpers.py
+
+or from Python:
+    import bluesky_helpers, fake_bluesky_server
+    server, base = fake_bluesky_server.start_server(latency=0.02)
+    bluesky_helpers.API_BASE = base
+
+Dependencies: Only uses standard library (no pip install required)
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import urllib.parse
+import zlib
+from datetime import datetime, timezone, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Size of the synthetic account pool that follows and replies are drawn from
+DEFAULT_ACCOUNTS = 5000
+
+# Upper bounds for generated data
+MAX_FOLLOWS = 1500
+MAX_POSTS_PER_DAY = 20
+MAX_THREAD_REPLIES = 200
+FEED_DAYS = 14
+
+FIRST_NAMES = [
+    'Mary', 'Patricia', 'Jennifer', 'Linda', 'Elizabeth', 'Susan', 'Jessica',
+    'James', 'Robert', 'John', 'Michael', 'David', 'William', 'Richard',
+    'Jordan', 'Taylor', 'Alex', 'Casey', 'Dr. Sarah', 'Sen. Mark', '', 'xXgamerXx',
+]
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis']
+
+
+def _rng(*parts):
+    """Random generator seeded by the given strings, so output is repeatable."""
+    return random.Random(zlib.crc32('|'.join(str(p) for p in parts).encode()))
+
+
+def _iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}Z"
+
+
+class SyntheticWorld:
+    """
+    Generates profiles, follows, feeds and threads on demand.
+
+    Accounts are identified by handle; their DID is 'did:fake:<handle>', so
+    either form can be used in requests.
+    """
+
+    def __init__(self, accounts=DEFAULT_ACCOUNTS, seed=0, now=None):
+        self.accounts = accounts
+        self.seed = seed
+        # Post times are relative to server start so "last 24 hours" windows work
+        self.now = now or datetime.now(timezone.utc)
+
+    def handle(self, actor):
+        return actor[len('did:fake:'):] if actor.startswith('did:fake:') else actor
+
+    def did(self, actor):
+        return f"did:fake:{self.handle(actor)}"
+
+    def exists(self, actor):
+        return not self.handle(actor).startswith('deleted')
+
+    def pool_handle(self, rng):
+        # Squaring the uniform draw makes low-numbered accounts popular,
+        # giving the heavy-tailed overlap real follow graphs have
+        return f"user{int(self.accounts * rng.random() ** 2)}.fake.test"
+
+    def basic(self, actor):
+        """The short profile embedded in follows, posts and replies."""
+        handle = self.handle(actor)
+        rng = _rng(self.seed, 'profile', handle)
+        return {
+            'did': self.did(handle),
+            'handle': handle,
+            'displayName': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}".strip(),
+        }
+
+    def profile(self, actor):
+        handle = self.handle(actor)
+        rng = _rng(self.seed, 'counts', handle)
+        return {
+            **self.basic(handle),
+            'followersCount': rng.randint(0, 100000),
+            'followsCount': len(self.follows(handle)),
+            'postsCount': len(self.posts(handle)),
+        }
+
+    def follows(self, actor):
+        handle = self.handle(actor)
+        rng = _rng(self.seed, 'follows', handle)
+        count = int(MAX_FOLLOWS * rng.random() ** 3)
+        followed = dict.fromkeys(self.pool_handle(rng) for _ in range(count))
+        return [h for h in followed if h != handle]
+
+    def posts(self, actor):
+        """All of an account's posts, newest first, as feed items."""
+        handle = self.handle(actor)
+        rng = _rng(self.seed, 'posts', handle)
+        per_day = rng.random() * MAX_POSTS_PER_DAY
+        count = int(per_day * FEED_DAYS)
+        author = self.basic(handle)
+        items = []
+        for i in range(count):
+            created = self.now - timedelta(days=FEED_DAYS * (i + rng.random()) / max(count, 1))
+            items.append({'post': {
+                'uri': f"at://{author['did']}/app.bsky.feed.post/{i}",
+                'cid': f"fakecid{i}",
+                'author': author,
+                'record': {'$type': 'app.bsky.feed.post', 'text': f"Post {i} by {handle}",
+                           'createdAt': _iso(created)},
+                'replyCount': int(rng.random() ** 4 * 300),
+                'repostCount': rng.randint(0, 50),
+                'likeCount': rng.randint(0, 500),
+                'quoteCount': rng.randint(0, 5),
+                'indexedAt': _iso(created),
+            }})
+        return items
+
+    def thread(self, uri, depth):
+        """Thread view for a post URI, with a random reply tree."""
+        try:
+            did, _, index = uri[len('at://'):].split('/')
+            item = self.posts(did)[int(index)]
+        except (ValueError, IndexError):
+            return None
+        rng = _rng(self.seed, 'thread', uri)
+        remaining = [min(item['post']['replyCount'], MAX_THREAD_REPLIES)]
+        root_time = datetime.fromisoformat(item['post']['record']['createdAt'].replace('Z', '+00:00'))
+
+        def reply(parent_uri, level, n):
+            if n == 0 or level > depth or remaining[0] <= 0:
+                return []
+            out = []
+            for j in range(n):
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+                roll = rng.random()
+                if roll < 0.01:
+                    out.append({'$type': 'app.bsky.feed.defs#blockedPost',
+                                'uri': f"{parent_uri}/b{j}", 'blocked': True})
+                    continue
+                if roll < 0.02:
+                    out.append({'$type': 'app.bsky.feed.defs#notFoundPost',
+                                'uri': f"{parent_uri}/n{j}", 'notFound': True})
+                    continue
+                author = self.basic(self.pool_handle(rng))
+                reply_uri = f"at://{author['did']}/app.bsky.feed.post/r{rng.getrandbits(40)}"
+                created = root_time + timedelta(minutes=rng.random() * 600 * level)
+                out.append({
+                    '$type': 'app.bsky.feed.defs#threadViewPost',
+                    'post': {
+                        'uri': reply_uri,
+                        'author': author,
+                        'record': {'$type': 'app.bsky.feed.post', 'text': 'reply',
+                                   'createdAt': _iso(created),
+                                   'reply': {'parent': {'uri': parent_uri}, 'root': {'uri': uri}}},
+                        'replyCount': 0,
+                    },
+                    'replies': reply(reply_uri, level + 1, int(rng.random() ** 3 * 4)),
+                })
+            return out
+
+        return {'thread': {
+            '$type': 'app.bsky.feed.defs#threadViewPost',
+            'post': item['post'],
+            'replies': reply(uri, 1, remaining[0]),
+        }}
+
+
+def load_fixtures(path):
+    """
+    Load recorded API data to serve instead of synthetic data.
+
+    The file is JSON with any of these keys (missing ones fall back to
+    synthetic data):
+        'profiles': {handle: profile dict}
+        'follows':  {handle: list of followed accounts, as get_all_follows()}
+        'feeds':    {handle: list of feed items, newest first}
+        'threads':  {post URI: get_post_thread() response}
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+class FakeBluesky:
+    """Request handling logic shared by every connection to the server."""
+
+    def __init__(self, world, fixtures=None, latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit=None, rate_window=300):
+        self.world = world
+        self.fixtures = fixtures or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.requests = 0
+        self.rejected = 0
+        self._window_start = time.time()
+        self._window_count = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(world.seed)
+
+    def _rate_headers(self):
+        """Check the quota; returns (allowed, ratelimit headers)."""
+        with self._lock:
+            self.requests += 1
+            now = time.time()
+            if now - self._window_start >= self.rate_window:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            injected = self._rng.random() < self.error_rate
+            reset = int(self._window_start + self.rate_window)
+            if self.rate_limit is None:
+                allowed = not injected
+                headers = {}
+            else:
+                allowed = not injected and self._window_count <= self.rate_limit
+                headers = {
+                    'ratelimit-limit': str(self.rate_limit),
+                    'ratelimit-remaining': str(max(0, self.rate_limit - self._window_count)),
+                    'ratelimit-reset': str(reset),
+                    'ratelimit-policy': f"{self.rate_limit};w={self.rate_window}",
+                }
+            if not allowed:
+                self.rejected += 1
+                headers['Retry-After'] = str(max(1, reset - int(now)) if not injected else 1)
+            return allowed, headers
+
+    def _page(self, items, params, key):
+        limit = max(1, min(int(params.get('limit', 50)), 100))
+        start = int(params.get('cursor') or 0)
+        page = {key: items[start:start + limit]}
+        if start + limit < len(items):
+            page['cursor'] = str(start + limit)
+        return page
+
+    def handle(self, endpoint, params):
+        """Return (status, body dict) for one XRPC call."""
+        world = self.world
+        fx = self.fixtures
+
+        if endpoint in ('app.bsky.actor.getProfile', 'app.bsky.graph.getFollows',
+                        'app.bsky.feed.getAuthorFeed'):
+            actor = params.get('actor', '')
+            if not actor:
+                return 400, {'error': 'InvalidRequest', 'message': 'Params must have "actor"'}
+            if not world.exists(actor):
+                return 400, {'error': 'InvalidRequest', 'message': 'Profile not found'}
+            handle = world.handle(actor)
+            if endpoint == 'app.bsky.actor.getProfile':
+                return 200, fx.get('profiles', {}).get(handle) or world.profile(handle)
+            if endpoint == 'app.bsky.graph.getFollows':
+                follows = fx.get('follows', {}).get(handle)
+                if follows is None:
+                    follows = [world.basic(h) for h in world.follows(handle)]
+                page = self._page(follows, params, 'follows')
+                page['subject'] = world.basic(handle)
+                return 200, page
+            feed = fx.get('feeds', {}).get(handle)
+            return 200, self._page(feed if feed is not None else world.posts(handle), params, 'feed')
+
+        if endpoint == 'app.bsky.actor.getProfiles':
+            actors = params.get('actors', [])
+            if len(actors) > 25:
+                return 400, {'error': 'InvalidRequest', 'message': 'Too many actors'}
+            return 200, {'profiles': [fx.get('profiles', {}).get(world.handle(a)) or world.profile(a)
+                                      for a in actors if world.exists(a)]}
+
+        if endpoint == 'app.bsky.feed.getPostThread':
+            uri = params.get('uri', '')
+            thread = fx.get('threads', {}).get(uri)
+            if thread is None:
+                thread = world.thread(uri, int(params.get('depth', 6)))
+            if thread is None:
+                return 400, {'error': 'NotFound', 'message': f"Post not found: {uri}"}
+            return 200, thread
+
+        return 501, {'error': 'MethodNotImplemented', 'message': f"Unknown endpoint {endpoint}"}
+
+
+def make_handler(api):
+    """Build a request handler class bound to a FakeBluesky instance."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+        def do_GET(self):
+            parts = urllib.parse.urlsplit(self.path)
+            endpoint = parts.path.rsplit('/', 1)[-1]
+            query = urllib.parse.parse_qs(parts.query)
+            params = {k: (v if k == 'actors' else v[-1]) for k, v in query.items()}
+
+            if api.latency or api.jitter:
+                time.sleep(api.latency + random.random() * api.jitter)
+
+            allowed, headers = api._rate_headers()
+            if allowed:
+                status, body = api.handle(endpoint, params)
+            else:
+                status, body = 429, {'error': 'RateLimitExceeded', 'message': 'Rate Limit Exceeded'}
+
+            data = json.dumps(body).encode()
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                data = gzip.compress(data)
+                headers['Content-Encoding'] = 'gzip'
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(host='127.0.0.1', port=0, accounts=DEFAULT_ACCOUNTS, seed=0, fixtures=None,
+                 latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=None, rate_window=300):
+    """
+    Start the fake API in a background thread.
+
+    Args:
+        host, port: Address to listen on (port 0 picks a free port)
+        accounts: Size of the synthetic account pool
+        seed: Changes all generated data
+        fixtures: Recorded data (dict from load_fixtures()) served in
+                  preference to synthetic data
+        latency: Seconds added to every response
+        jitter: Extra random delay, uniform in [0, jitter] seconds
+        error_rate: Probability of answering any request with a 429
+        rate_limit: If set, allow this many requests per rate_window
+                    seconds and answer 429 beyond that
+        rate_window: Quota window in seconds
+
+    Returns:
+        Tuple (server, base_url). Set bluesky_helpers.API_BASE = base_url to
+        use it; server.api holds request/rejection counters; call
+        server.shutdown() to stop.
+    """
+    api = FakeBluesky(SyntheticWorld(accounts, seed), fixtures, latency, jitter,
+                      error_rate, rate_limit, rate_window)
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    server.api = api
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/xrpc"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Bluesky XRPC API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--accounts', type=int, default=DEFAULT_ACCOUNTS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fixtures', default=None, help="JSON file of recorded responses")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to each response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random delay (seconds)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument('--rate-limit', type=int, default=None, help="Requests allowed per window")
+    parser.add_argument('--rate-window', type=int, default=300, help="Quota window (seconds)")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else None
+    server, base = start_server(args.host, args.port, args.accounts, args.seed, fixtures,
+                                args.latency, args.jitter, args.error_rate,
+                                args.rate_limit, args.rate_window)
+    print(f"Fake Bluesky API at {base}")
+    print(f"Use it with: BLUESKY_API_BASE={base} python your_script.py")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        api = server.api
+        print(f"\nServed {api.requests} requests ({api.rejected} rejected with 429)")
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
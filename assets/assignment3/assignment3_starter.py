@@ -5,6 +5,7 @@ What this gives you:
 - Baseline Ollama player calls
 - Calibration sampling loops
 - Answer-file generation in the required CSV format
+- Grid sweeps over models, temperatures, top-k and prompt files
 
 What is intentionally left for you:
 - Better prompts and prompt experiments
@@ -20,15 +21,23 @@ import argparse
 import csv
 import json
 import math
+import os
 import re
+import time
 import urllib.request
-from collections import Counter
+from collections import Counter, deque
+from contextlib import closing
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from statistics import NormalDist
+from typing import Callable, Iterable, Iterator, TypeVar
 
 OLLAMA_URL = "http://localhost:11434/api/generate"
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 def normalize_answer(text: str) -> str:
     text = text.strip().lower()
@@ -126,6 +135,32 @@ def ollama_generate(
     return str(data.get("response", "")).strip()
 
 
+def map_ordered(fn: Callable[[T], R], items: Iterable[T], concurrency: int) -> Iterator[R]:
+    """Yield fn(item) for each item, in input order, with up to `concurrency` calls in flight.
+
+    Results are yielded in the same order as `items` no matter which call finishes
+    first, so outputs are identical to a serial run. Only a small window of calls
+    is submitted ahead, and closing the iterator early cancels anything not started.
+    """
+    if concurrency <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending: deque[Future[R]] = deque()
+        try:
+            for item in items:
+                pending.append(pool.submit(fn, item))
+                if len(pending) >= 2 * concurrency:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
 def entropy_from_counts(counts: Counter[str]) -> float:
     total = sum(counts.values())
     if total == 0:
@@ -161,6 +196,103 @@ def tv_to_uniform(counts: Counter[str], support: Iterable[str]) -> float:
     return 0.5 * sum(abs((counts.get(item, 0) / total) - u) for item in support)
 
 
+class OnlineDistribution:
+    """Answer distribution whose statistics update in O(1) per sample.
+
+    Keeps S = sum(c log c) and Q = sum(c log^2 c) over answer counts, so the
+    plug-in entropy is log(n) - S/n without a pass over the counts. The same
+    sums restricted to `support` give KL to uniform, matching `kl_to_uniform`.
+
+    The plug-in entropy is biased low while much of the distribution is
+    unseen. The confidence interval therefore runs from the plug-in
+    estimate minus z*se up to the Miller-Madow estimate H + (unique - 1)/(2n)
+    plus z*se, where se is the delta-method standard error
+    sqrt((sum(p log^2 p) - H^2) / n). Convergence also requires the
+    Good-Turing missing mass (singletons / n) to be small. Otherwise a run
+    of all-unique answers has se == 0 and would look converged at once.
+    """
+
+    def __init__(self, support: Iterable[str] | None = None, confidence: float = 0.95) -> None:
+        self.support = set(support) if support is not None else None
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.counts: Counter[str] = Counter()
+        self.n = 0
+        self._s = 0.0
+        self._q = 0.0
+        self._n_support = 0
+        self._s_support = 0.0
+        self._singletons = 0
+
+    def add(self, answer: str) -> None:
+        c = self.counts[answer]
+        new = c + 1
+        log_c = math.log(c) if c else 0.0
+        log_new = math.log(new)
+        ds = new * log_new - c * log_c
+        self._s += ds
+        self._q += new * log_new * log_new - c * log_c * log_c
+        if self.support is not None and answer in self.support:
+            self._n_support += 1
+            self._s_support += ds
+        self._singletons += 1 if c == 0 else -1 if c == 1 else 0
+        self.counts[answer] = new
+        self.n += 1
+
+    @property
+    def unique(self) -> int:
+        return len(self.counts)
+
+    def entropy(self) -> float:
+        if self.n == 0:
+            return 0.0
+        return max(0.0, math.log(self.n) - self._s / self.n)
+
+    def entropy_miller_madow(self) -> float:
+        if self.n == 0:
+            return 0.0
+        return self.entropy() + (self.unique - 1) / (2 * self.n)
+
+    def missing_mass(self) -> float:
+        """Good-Turing estimate of the probability of a not-yet-seen answer."""
+        if self.n == 0:
+            return 1.0
+        return self._singletons / self.n
+
+    def entropy_stderr(self) -> float:
+        if self.n == 0:
+            return math.inf
+        log_n = math.log(self.n)
+        second_moment = self._q / self.n - 2 * log_n * self._s / self.n + log_n * log_n
+        h = self.entropy()
+        return math.sqrt(max(0.0, second_moment - h * h) / self.n)
+
+    def entropy_ci(self) -> tuple[float, float]:
+        half = self.z * self.entropy_stderr()
+        return max(0.0, self.entropy() - half), self.entropy_miller_madow() + half
+
+    def converged(self, tol: float, min_samples: int, max_missing_mass: float = 0.05) -> bool:
+        """True once the entropy CI half-width is within `tol` and little mass is unseen."""
+        if self.n < max(1, min_samples) or self.missing_mass() > max_missing_mass:
+            return False
+        lo, hi = self.entropy_ci()
+        return (hi - lo) / 2 <= tol
+
+    def kl_to_uniform(self) -> float:
+        if self.n == 0 or not self.support:
+            return 0.0
+        # sum over support of (c/n) log(c K / n)
+        log_k = math.log(len(self.support))
+        return (self._s_support + self._n_support * (log_k - math.log(self.n))) / self.n
+
+    def tv_to_uniform(self) -> float:
+        if self.support is None:
+            return 0.0
+        return tv_to_uniform(self.counts, self.support)
+
+    def top(self, k: int) -> list[tuple[str, int]]:
+        return self.counts.most_common(k)
+
+
 def write_csv(path: Path, rows: list[dict]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", newline="", encoding="utf-8") as f:
@@ -172,6 +304,99 @@ def write_csv(path: Path, rows: list[dict]) -> None:
         writer.writerows(rows)
 
 
+class StreamingCsvWriter:
+    """Write CSV rows as they are produced so a killed run keeps what it already has.
+
+    Every row is flushed to the OS right away; every `fsync_every` rows (and on
+    close) the file is also fsynced to disk. With `append=True` rows go after
+    whatever is already in the file and the header is only written if it is empty.
+    """
+
+    def __init__(self, path: Path, fieldnames: list[str], append: bool = False, fsync_every: int = 50) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        has_header = append and path.exists() and path.stat().st_size > 0
+        self.path = path
+        self.fsync_every = fsync_every
+        self._unsynced = 0
+        self._file = path.open("a" if append else "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames)
+        if not has_header:
+            self._writer.writeheader()
+            self._file.flush()
+
+    def write(self, row: dict[str, object]) -> None:
+        self._writer.writerow(row)
+        self._file.flush()
+        self._unsynced += 1
+        if self.fsync_every > 0 and self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self) -> StreamingCsvWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def read_existing_rows(path: Path, fieldnames: list[str]) -> list[dict[str, str]]:
+    """Return the rows already written to `path`, for --resume.
+
+    A crash can leave a torn last record, possibly cut inside a quoted field
+    that spans lines (raw answers may contain newlines). Anything after the
+    last complete CSV record is cut off the file so appended rows start on
+    a clean record.
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return []
+    data = path.read_bytes()
+    consumed = 0
+    exhausted = False
+
+    def lines() -> Iterator[str]:
+        nonlocal consumed, exhausted
+        start = 0
+        while start < len(data):
+            end = data.find(b"\n", start) + 1 or len(data)
+            consumed = end
+            yield data[start:end].decode("utf-8", errors="replace")
+            start = end
+        exhausted = True
+
+    rows: list[dict[str, str]] = []
+    complete = 0
+    header = None
+    for record in csv.reader(lines()):
+        # A record only counts if it ended on its own line terminator, not
+        # because the file ran out (torn line or unterminated quoted field)
+        if exhausted or data[consumed - 1 : consumed] != b"\n":
+            break
+        complete = consumed
+        if header is None:
+            header = record
+            if header != fieldnames:
+                raise ValueError(
+                    f"{path} has columns {header}, expected {fieldnames}. "
+                    "Move it aside or run without --resume."
+                )
+        elif len(record) == len(fieldnames):
+            rows.append(dict(zip(fieldnames, record)))
+
+    if complete < len(data):
+        with path.open("r+b") as f:
+            f.truncate(complete)
+    return rows
+
+
 def get_calibration_prompt(task: str, prompt_file: str | None) -> str:
     if prompt_file:
         return Path(prompt_file).read_text(encoding="utf-8").strip()
@@ -201,57 +426,86 @@ def run_calibration(args: argparse.Namespace) -> None:
         support = None
 
     temps = parse_temps(args.temperatures)
-    all_rows: list[dict[str, object]] = []
     summaries: list[dict[str, object]] = []
 
-    for temp in temps:
-        counts: Counter[str] = Counter()
-        seed = args.seed_start
-        for i in range(args.samples):
-            raw = ollama_generate(
-                model=args.model,
-                prompt=prompt,
-                temperature=temp,
-                top_k=args.top_k,
-                seed=seed,
-                max_tokens=args.max_tokens,
-            )
-            if seed is not None:
-                seed += 1
-
-            ans = normalize_answer(raw)
-            if args.task == "day":
-                ans = ans.split()[0] if ans else ""
-            counts[ans] += 1
-            all_rows.append(
-                {
-                    "task": args.task,
-                    "model": args.model,
-                    "temperature": temp,
-                    "sample_idx": i,
-                    "prompt_id": args.prompt_id,
-                    "raw": raw,
-                    "answer_norm": ans,
-                }
+    fieldnames = ["task", "model", "temperature", "sample_idx", "prompt_id", "raw", "answer_norm"]
+    samples_path = outdir / f"calibration_{args.task}_samples.csv"
+    existing = read_existing_rows(samples_path, fieldnames) if args.resume else []
+    done: dict[float, dict[int, str]] = {}
+    for row in existing:
+        done.setdefault(float(row["temperature"]), {})[int(row["sample_idx"])] = row["answer_norm"]
+    if existing:
+        print(f"Resuming: {len(existing)} samples already in {samples_path}")
+
+    with StreamingCsvWriter(samples_path, fieldnames, append=args.resume, fsync_every=args.fsync_every) as writer:
+        for temp in temps:
+            stats = OnlineDistribution(support)
+            prior = done.get(temp, {})
+            for i, ans in prior.items():
+                if i < args.samples:
+                    stats.add(ans)
+            todo = [i for i in range(args.samples) if i not in prior]
+            early_stop = args.early_stop_tol is not None
+            stopped = (
+                early_stop
+                and stats.n < args.samples
+                and stats.converged(args.early_stop_tol, args.min_samples, args.max_missing_mass)
             )
 
-        summary: dict[str, object] = {
-            "task": args.task,
-            "model": args.model,
-            "temperature": temp,
-            "samples": args.samples,
-            "prompt_id": args.prompt_id,
-            "unique_answers": len(counts),
-            "entropy_nats": entropy_from_counts(counts),
-            "top_answers": counts.most_common(20),
-        }
-        if support is not None:
-            summary["kl_to_uniform"] = kl_to_uniform(counts, support)
-            summary["tv_to_uniform"] = tv_to_uniform(counts, support)
-        summaries.append(summary)
+            # Seeds depend only on sample_idx, so concurrent runs match serial ones.
+            def sample(i: int, temp: float = temp) -> str:
+                return ollama_generate(
+                    model=args.model,
+                    prompt=prompt,
+                    temperature=temp,
+                    top_k=args.top_k,
+                    seed=args.seed_start + i if args.seed_start is not None else None,
+                    max_tokens=args.max_tokens,
+                )
 
-    samples_path = outdir / f"calibration_{args.task}_samples.csv"
-    write_csv(samples_path, all_rows)
+            # Closing the results early cancels queued calls once converged.
+            with closing(map_ordered(sample, [] if stopped else todo, args.concurrency)) as results:
+                for i, raw in zip(todo, results):
+                    ans = normalize_answer(raw)
+                    if args.task == "day":
+                        ans = ans.split()[0] if ans else ""
+                    stats.add(ans)
+                    writer.write(
+                        {
+                            "task": args.task,
+                            "model": args.model,
+                            "temperature": temp,
+                            "sample_idx": i,
+                            "prompt_id": args.prompt_id,
+                            "raw": raw,
+                            "answer_norm": ans,
+                        }
+                    )
+                    if early_stop and stats.converged(args.early_stop_tol, args.min_samples, args.max_missing_mass):
+                        stopped = stats.n < args.samples
+                        break
+
+            if stopped:
+                print(f"temperature {temp}: entropy converged after {stats.n} samples")
+            entropy_lo, entropy_hi = stats.entropy_ci()
+            summary: dict[str, object] = {
+                "task": args.task,
+                "model": args.model,
+                "temperature": temp,
+                "samples": stats.n,
+                "early_stopped": stopped,
+                "prompt_id": args.prompt_id,
+                "unique_answers": stats.unique,
+                "entropy_nats": stats.entropy(),
+                "entropy_miller_madow": stats.entropy_miller_madow(),
+                "entropy_ci95": [entropy_lo, entropy_hi],
+                "missing_mass": stats.missing_mass(),
+                "top_answers": stats.top(20),
+            }
+            if support is not None:
+                summary["kl_to_uniform"] = stats.kl_to_uniform()
+                summary["tv_to_uniform"] = stats.tv_to_uniform()
+            summaries.append(summary)
 
     summary_path = outdir / f"calibration_{args.task}_summary.json"
     summary_path.write_text(json.dumps(summaries, indent=2), encoding="utf-8")
@@ -288,22 +542,45 @@ def run_generate_answers(args: argparse.Namespace) -> None:
     outdir.mkdir(parents=True, exist_ok=True)
     out_path = Path(args.out) if args.out else outdir / f"answers_{player_id}.csv"
 
-    rows: list[dict[str, object]] = []
-    seed = args.seed_start
-    for q in questions:
-        prompt = render_player_prompt(q.letter, q.category, template)
-        for r in range(args.rounds):
-            raw = ollama_generate(
-                model=args.model,
-                prompt=prompt,
-                temperature=args.temperature,
-                top_k=args.top_k,
-                seed=seed,
-                max_tokens=args.max_tokens,
-            )
-            if seed is not None:
-                seed += 1
-            rows.append(
+    # One job per (question, round); seeds follow that order so that concurrent
+    # runs match serial ones exactly.
+    jobs = [(q, r) for q in questions for r in range(args.rounds)]
+    prompts = {q.question_id: render_player_prompt(q.letter, q.category, template) for q in questions}
+
+    fieldnames = [
+        "question_id",
+        "letter",
+        "category",
+        "round_idx",
+        "answer",
+        "model",
+        "player_id",
+        "temperature",
+        "top_k",
+        "prompt_id",
+    ]
+    existing = read_existing_rows(out_path, fieldnames) if args.resume else []
+    done = {(row["question_id"], int(row["round_idx"])) for row in existing}
+    todo = [idx for idx, (q, r) in enumerate(jobs) if (q.question_id, r) not in done]
+    if existing:
+        print(f"Resuming: {len(existing)} rows already in {out_path}, {len(todo)} to go")
+
+    def answer(job_idx: int) -> str:
+        q, _ = jobs[job_idx]
+        return ollama_generate(
+            model=args.model,
+            prompt=prompts[q.question_id],
+            temperature=args.temperature,
+            top_k=args.top_k,
+            seed=args.seed_start + job_idx if args.seed_start is not None else None,
+            max_tokens=args.max_tokens,
+        )
+
+    written = 0
+    with StreamingCsvWriter(out_path, fieldnames, append=args.resume, fsync_every=args.fsync_every) as writer:
+        for job_idx, raw in zip(todo, map_ordered(answer, todo, args.concurrency)):
+            q, r = jobs[job_idx]
+            writer.write(
                 {
                     "question_id": q.question_id,
                     "letter": q.letter,
@@ -317,13 +594,227 @@ def run_generate_answers(args: argparse.Namespace) -> None:
                     "prompt_id": args.prompt_id,
                 }
             )
+            written += 1
 
-    write_csv(out_path, rows)
     print(f"Wrote {out_path}")
-    print(f"Rows: {len(rows)}")
+    print(f"Rows: {len(existing) + written}")
     print("Next step: pass one or more answer CSV files to starter/judge.py.")
 
 
+@dataclass
+class SweepConfig:
+    model: str
+    temperature: float
+    top_k: int | None
+    prompt_file: str | None
+
+    @property
+    def prompt_id(self) -> str:
+        return Path(self.prompt_file).stem if self.prompt_file else "baseline"
+
+    @property
+    def tag(self) -> str:
+        top_k = "none" if self.top_k is None else self.top_k
+        return safe_name(f"{self.model}__t{self.temperature}__k{top_k}__{self.prompt_id}")
+
+
+def load_sweep_grid(path: str | Path) -> tuple[str, list[SweepConfig], dict[str, object]]:
+    """Read a JSON grid spec and expand it to one config per combination.
+
+    Expected keys: "mode" ("calibrate" or "generate-answers"), "models",
+    and optionally "temperatures", "top_k", "prompt_files" (null means the
+    built-in prompt) and "args" (any other subcommand options, e.g.
+    {"task": "day", "samples": 200}). A grid dimension that is left out
+    uses the subcommand's own default, so a sweep config matches a plain
+    run with the same options.
+    """
+    spec = json.loads(Path(path).read_text(encoding="utf-8"))
+    mode = spec.get("mode", "generate-answers")
+    if mode not in ("calibrate", "generate-answers"):
+        raise ValueError(f"unknown sweep mode: {mode}")
+    models = spec.get("models") or []
+    if not models:
+        raise ValueError("sweep grid needs at least one model")
+    extra = {key.replace("-", "_"): value for key, value in spec.get("args", {}).items()}
+    defaults = subcommand_args(mode, models[0], extra)
+
+    if mode == "calibrate":
+        default_temps = parse_temps(defaults.temperatures)
+    else:
+        default_temps = [defaults.temperature]
+    configs = [
+        SweepConfig(model=m, temperature=float(t), top_k=k, prompt_file=pf)
+        for m in models
+        for t in spec.get("temperatures", default_temps)
+        for k in spec.get("top_k", [defaults.top_k])
+        for pf in spec.get("prompt_files", [defaults.prompt_file])
+    ]
+    tags = [c.tag for c in configs]
+    dupes = sorted({t for t in tags if tags.count(t) > 1})
+    if dupes:
+        raise ValueError(f"sweep grid has configs with the same tag: {', '.join(dupes)}")
+    return mode, configs, extra
+
+
+# Options the sweep sets itself, from the grid dimensions or its own CLI flags
+SWEEP_OWNED_ARGS = {
+    "cmd",
+    "func",
+    "model",
+    "temperature",
+    "temperatures",
+    "top_k",
+    "prompt_file",
+    "prompt_id",
+    "player_id",
+    "outdir",
+    "out",
+    "concurrency",
+    "resume",
+}
+
+
+def subcommand_args(mode: str, model: str, extra: dict[str, object]) -> argparse.Namespace:
+    """Parse `mode`'s defaults for `model`, then apply the grid's "args"."""
+    argv = [mode, "--model", model]
+    if mode == "calibrate":
+        if "task" not in extra:
+            raise ValueError('calibrate sweeps need "task" in the grid "args"')
+        argv += ["--task", str(extra["task"])]
+    args = build_parser().parse_args(argv)
+
+    for key, value in extra.items():
+        if key in SWEEP_OWNED_ARGS:
+            raise ValueError(f"sweep arg {key!r} is set by the grid or sweep flags, not by \"args\"")
+        if not hasattr(args, key):
+            raise ValueError(f"unsupported sweep arg: {key}")
+        setattr(args, key, value)
+    return args
+
+
+def sweep_run_args(
+    mode: str, config: SweepConfig, extra: dict[str, object], outdir: Path, concurrency: int, resume: bool = False
+) -> argparse.Namespace:
+    args = subcommand_args(mode, config.model, extra)
+
+    if mode == "calibrate":
+        args.temperatures = str(config.temperature)
+    else:
+        args.temperature = config.temperature
+        args.player_id = config.tag
+    args.top_k = config.top_k
+    args.prompt_file = config.prompt_file
+    args.prompt_id = config.prompt_id
+    args.outdir = str(outdir / config.tag)
+    args.concurrency = concurrency
+    args.resume = resume
+    return args
+
+
+def run_sweep(args: argparse.Namespace) -> None:
+    mode, configs, extra = load_sweep_grid(args.grid)
+    outdir = Path(args.outdir)
+    manifest_path = outdir / "sweep_manifest.json"
+
+    # Group by model so Ollama loads each model once; configs for the same
+    # model share the loaded weights and can run side by side.
+    by_model: dict[str, list[SweepConfig]] = {}
+    for config in configs:
+        by_model.setdefault(config.model, []).append(config)
+
+    runs = {
+        config.tag: {
+            "tag": config.tag,
+            "mode": mode,
+            "model": config.model,
+            "temperature": config.temperature,
+            "top_k": config.top_k,
+            "prompt_file": config.prompt_file,
+            "prompt_id": config.prompt_id,
+            "outdir": str(outdir / config.tag),
+            "status": "pending",
+        }
+        for config in configs
+    }
+    manifest: dict[str, object] = {"grid": str(args.grid), "mode": mode, "args": extra, "runs": list(runs.values())}
+
+    def write_manifest() -> None:
+        manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    # --concurrency is the total Ollama budget: split it across the configs
+    # of a model that run at once, so the server never sees more requests
+    # than its OLLAMA_NUM_PARALLEL.
+    total = max(1, args.concurrency)
+    workers = {
+        model: min(max(1, args.config_concurrency), len(model_configs), total)
+        for model, model_configs in by_model.items()
+    }
+
+    # Build every run's args first so a bad grid fails before any Ollama calls.
+    run_args = {
+        config.tag: sweep_run_args(
+            mode, config, extra, outdir, total // workers[config.model], args.resume
+        )
+        for config in configs
+    }
+
+    def run_one(config: SweepConfig) -> None:
+        start = time.time()
+        try:
+            run_args[config.tag].func(run_args[config.tag])
+        finally:
+            runs[config.tag]["seconds"] = round(time.time() - start, 3)
+
+    outdir.mkdir(parents=True, exist_ok=True)
+    print(f"Sweep: {len(configs)} configs across {len(by_model)} models")
+    write_manifest()
+    for model, model_configs in by_model.items():
+        per_config = total // workers[model]
+        print(f"== {model}: {len(model_configs)} configs, {workers[model]} at a time x {per_config} requests")
+        with ThreadPoolExecutor(max_workers=workers[model]) as pool:
+            futures = {pool.submit(run_one, config): config for config in model_configs}
+            for future in as_completed(futures):
+                config = futures[future]
+                run = runs[config.tag]
+                try:
+                    future.result()
+                except Exception as exc:
+                    run["status"] = "failed"
+                    run["error"] = f"{type(exc).__name__}: {exc}"
+                    print(f"Failed {config.tag}: {run['error']}")
+                else:
+                    run["status"] = "ok"
+                    run["outputs"] = sorted(str(p) for p in Path(str(run["outdir"])).iterdir())
+                write_manifest()
+
+    failed = sum(1 for run in runs.values() if run["status"] != "ok")
+    print(f"Wrote {manifest_path}")
+    print(f"Configs ok: {len(configs) - failed}, failed: {failed}")
+
+
+def add_output_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Append to an existing output file and skip rows it already has.",
+    )
+    parser.add_argument(
+        "--fsync-every",
+        type=int,
+        default=50,
+        help="Force rows to disk every N rows (0 = only when the file is closed).",
+    )
+
+
+def add_concurrency_arg(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Ollama requests kept in flight at once. Match the server's OLLAMA_NUM_PARALLEL.",
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Assignment 3 starter CLI (player side)")
     sub = parser.add_subparsers(dest="cmd", required=True)
@@ -338,7 +829,22 @@ def build_parser() -> argparse.ArgumentParser:
     p_cal.add_argument("--seed-start", type=int, default=None)
     p_cal.add_argument("--prompt-file", default=None, help="Optional text file with full calibration prompt.")
     p_cal.add_argument("--prompt-id", default="baseline", help="Tag recorded in outputs.")
+    p_cal.add_argument(
+        "--early-stop-tol",
+        type=float,
+        default=None,
+        help="Stop a temperature once the 95%% CI half-width of its entropy is within this many nats.",
+    )
+    p_cal.add_argument("--min-samples", type=int, default=50, help="Never early-stop before this many samples.")
+    p_cal.add_argument(
+        "--max-missing-mass",
+        type=float,
+        default=0.05,
+        help="Never early-stop while the share of answers seen only once is above this.",
+    )
     p_cal.add_argument("--outdir", default="outputs")
+    add_concurrency_arg(p_cal)
+    add_output_args(p_cal)
     p_cal.set_defaults(func=run_calibration)
 
     p_gen = sub.add_parser("generate-answers", help="Generate one player answer CSV file")
@@ -358,8 +864,29 @@ def build_parser() -> argparse.ArgumentParser:
     p_gen.add_argument("--player-id", default=None, help="Optional player id. Defaults to sanitized model tag.")
     p_gen.add_argument("--out", default=None, help="Optional output CSV path.")
     p_gen.add_argument("--outdir", default="outputs")
+    add_concurrency_arg(p_gen)
+    add_output_args(p_gen)
     p_gen.set_defaults(func=run_generate_answers)
 
+    p_sweep = sub.add_parser("sweep", help="Run calibrate or generate-answers over a grid of configs")
+    p_sweep.add_argument("--grid", required=True, help="JSON grid spec (models x temperatures x top_k x prompt files).")
+    p_sweep.add_argument("--outdir", default="outputs/sweep")
+    p_sweep.add_argument(
+        "--config-concurrency",
+        type=int,
+        default=2,
+        help="Configs of the same model run at once (capped by --concurrency). Models run one after another.",
+    )
+    p_sweep.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Total Ollama requests in flight, split evenly across the configs running at once. "
+        "Match the server's OLLAMA_NUM_PARALLEL.",
+    )
+    p_sweep.add_argument("--resume", action="store_true", help="Resume each config's output; see calibrate --resume.")
+    p_sweep.set_defaults(func=run_sweep)
+
     return parser
 
 